@@ -5,15 +5,37 @@ Example usage of the rangepy library.
 This script demonstrates how to use rangepy to retrieve species range maps.
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pooch
 import rangepy
 
+try:
+    import matplotlib.pyplot as plt
+    import contextily as ctx
+except ImportError:
+    plt = None
+    ctx = None
+else:
+    # Keep downloaded basemap tiles across runs
+    ctx.set_cache_dir(str(pooch.os_cache("rangepy") / "tiles"))
+
+
+def fetch_range(species, admin_level):
+    """Search for a species and retrieve its range map."""
+    search_results = rangepy.search_species(species)
+    range_df = rangepy.get_species_range(species, admin_level=admin_level)
+    return search_results, range_df
+
+
 def main():
     print("RangePy Example Usage")
     print("=" * 50)
-    
+
     # List available data sources
     print("Available sources:", rangepy.list_available_sources())
-    
+
     species_examples = [
         "American Tree Sparrow",
         "American beaver",
@@ -39,17 +61,30 @@ def main():
         "White-tailed deer",
     ]
 
-    for admin_level in [None, "admin1", "admin0"]:
-        for species in species_examples:
-            print(f"\nTrying to get range for: {species}")
-            
-            # Search for the species first
-            search_results = rangepy.search_species(species)
-            print(f"Search results: {len(search_results)} found")
-            
-            # Get the range map
+    if plt is None:
+        print("\nPlotting libraries not found. Please install matplotlib and contextily to see the maps.")
+
+    admin_levels = [None, "admin1", "admin0"]
+
+    # Downloads are I/O-bound, so fetch all ranges concurrently and plot on the
+    # main thread (matplotlib is not thread-safe) as results come in
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = {
+            executor.submit(fetch_range, species, admin_level): (species, admin_level)
+            for admin_level in admin_levels
+            for species in species_examples
+        }
+
+        # Reuse a single figure for all maps
+        fig, ax = plt.subplots(figsize=(10, 10)) if plt is not None else (None, None)
+
+        for future in as_completed(futures):
+            species, admin_level = futures[future]
+            print(f"\nRange for: {species} (admin_level={admin_level})")
+
             try:
-                range_df = rangepy.get_species_range(species, admin_level="admin1")
+                search_results, range_df = future.result()
+                print(f"Search results: {len(search_results)} found")
                 if range_df is not None:
                     print(f"Successfully retrieved range data!")
                     print(f"DataFrame shape: {range_df.shape}")
@@ -58,39 +93,35 @@ def main():
                     print("Sample data:")
                     print(range_df.head())
                     # Plot the range map
-                    try:
-                        import os
-                        import matplotlib.pyplot as plt
-                        import contextily as ctx
-
-                        # Create a plot
-                        fig, ax = plt.subplots(figsize=(10, 10))
-
-                        # Plot the species range, reprojecting to Web Mercator (EPSG:3857) for the basemap
-                        range_df.to_crs(epsg=3857).plot(ax=ax, alpha=0.5, edgecolor='k', facecolor='red')
-
-                        # Add a basemap from contextily
-                        ctx.add_basemap(ax, source=ctx.providers.OpenStreetMap.Mapnik)
-
-                        # Customize and show the plot
-                        ax.set_title(f"Range Map for {species}")
-                        ax.set_axis_off()
-                        plt.tight_layout()
-                        os.makedirs("figures", exist_ok=True)
-                        plt.savefig(f"figures/{species.replace(' ', '_')}_{str(admin_level)}_range_map.png", bbox_inches='tight', dpi=300)
-                        plt.show()
-                        plt.close()
-
-                    except ImportError:
-                        print("\nPlotting libraries not found. Please install matplotlib and contextily to see the map.")
-                    except Exception as plot_error:
-                        print(f"\nAn error occurred during plotting: {plot_error}")
+                    if ax is not None:
+                        try:
+                            ax.cla()
+
+                            # Plot the species range, reprojected once to Web Mercator (EPSG:3857) for the basemap
+                            range_df_3857 = range_df.to_crs(epsg=3857)
+                            range_df_3857.plot(ax=ax, alpha=0.5, edgecolor='k', facecolor='red')
+
+                            # Add a basemap from contextily
+                            ctx.add_basemap(ax, source=ctx.providers.OpenStreetMap.Mapnik)
+
+                            # Customize and save the plot
+                            ax.set_title(f"Range Map for {species}")
+                            ax.set_axis_off()
+                            fig.tight_layout()
+                            os.makedirs("figures", exist_ok=True)
+                            fig.savefig(f"figures/{species.replace(' ', '_')}_{str(admin_level)}_range_map.png", bbox_inches='tight', dpi=300)
+
+                        except Exception as plot_error:
+                            print(f"\nAn error occurred during plotting: {plot_error}")
                 else:
                     print("No range data found")
             except Exception as e:
                 print(f"Error retrieving range: {e}")
-            
+
             print("-" * 30)
 
+        if fig is not None:
+            plt.close(fig)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
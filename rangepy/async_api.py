@@ -0,0 +1,129 @@
+"""Asynchronous variants of the rangepy API.
+
+Name lookups are sent concurrently over a single ``httpx.AsyncClient``, so
+resolving many species takes about as long as the slowest request instead of
+the sum of all of them. Requires the optional ``httpx`` dependency, install it
+with ``pip install rangepy[async]``.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+from typing import TYPE_CHECKING, List, Literal, Optional
+
+from . import core
+from .species_resolver import _MAX_RETRIES, _RETRY_BACKOFF, _RETRY_STATUSES, SpeciesMatch
+
+if TYPE_CHECKING:
+    import geopandas as gpd
+    import httpx
+
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrent connections to GBIF
+_MAX_CONNECTIONS = 32
+
+
+def _create_client() -> httpx.AsyncClient:
+    """Create an HTTP client for GBIF lookups, using HTTP/2 when it is available.
+
+    Failed connections are retried like in the synchronous resolver's session.
+    """
+    try:
+        import httpx
+    except ImportError as e:
+        raise ImportError(
+            "The async API requires httpx. Install it with 'pip install rangepy[async]'."
+        ) from e
+
+    transport = httpx.AsyncHTTPTransport(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_connections=_MAX_CONNECTIONS),
+        retries=_MAX_RETRIES,
+    )
+    return httpx.AsyncClient(transport=transport, timeout=10)
+
+
+async def aresolve_name(name: str, client: Optional[httpx.AsyncClient] = None) -> Optional[SpeciesMatch]:
+    """Resolve a species name to standardized taxonomic information.
+
+    Shares its cache with the synchronous API, so names resolved by either are
+    not looked up again.
+
+    Args:
+        name: Common or scientific name
+        client: Optional client to send the request with, a temporary one is
+                created if omitted
+
+    Returns:
+        SpeciesMatch with species information or None if not found
+    """
+    resolver = core._resolver
+    key = resolver._cache_key(name)
+    try:
+        return resolver._lookup(key)
+    except KeyError:
+        pass
+
+    if client is None:
+        async with _create_client() as client:
+            return await aresolve_name(name, client)
+
+    try:
+        for attempt in range(_MAX_RETRIES + 1):
+            response = await client.get(resolver._match_url, params={"name": name})
+            if response.status_code not in _RETRY_STATUSES or attempt == _MAX_RETRIES:
+                break
+            # Retry transient gateway errors with the same backoff as the synchronous session
+            await asyncio.sleep(_RETRY_BACKOFF * 2 ** attempt)
+        response.raise_for_status()
+
+        data = response.json()
+        logger.debug("GBIF match response for '%s': %s", name, data)
+    except Exception as e:
+        logger.warning("Error resolving species name '%s': %s", name, e)
+        return None
+
+    # Only successful lookups are cached, errors are retried on the next call
+    match = resolver._parse_match(data)
+    resolver._remember(key, match)
+    return match
+
+
+async def search_species_bulk(names: List[str]) -> list:
+    """Search for several species concurrently.
+
+    Args:
+        names: Search terms (common or scientific names)
+
+    Returns:
+        List of matching species information in input order, names without a
+        match are left out, the same as search_species for a list of names
+    """
+    # Look up each distinct name once, all over the same connection pool
+    unique_names = list(dict.fromkeys(names))
+    async with _create_client() as client:
+        matches = await asyncio.gather(*(aresolve_name(name, client) for name in unique_names))
+
+    by_name = dict(zip(unique_names, matches))
+    return core._search_results(by_name[name] for name in names)
+
+
+def search_species_bulk_sync(names: List[str]) -> list:
+    """Blocking wrapper around search_species_bulk for code without an event loop."""
+    return asyncio.run(search_species_bulk(names))
+
+
+async def aget_species_range(
+    species_name: str,
+    source: str = "usgs_gap",
+    admin_level: Optional[Literal['admin0', 'admin1']] = None
+) -> Optional[gpd.GeoDataFrame]:
+    """Get species range map without blocking the event loop.
+
+    Runs get_species_range in a worker thread, see there for arguments, return
+    value and errors.
+    """
+    return await asyncio.to_thread(core.get_species_range, species_name, source, admin_level)
@@ -1,28 +1,64 @@
-import geopandas as gpd
-from typing import Optional, Literal
-from .species_resolver import SpeciesNameResolver
-from .sources import USGSGAPSource
+from __future__ import annotations
+
+import logging
+import importlib.util
+import os
+import re
+import uuid
+import pooch
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Iterable, List, Mapping, Optional, Literal, Type, Union
+from .species_resolver import SpeciesMatch, SpeciesNameResolver
+from .sources import RangeSource, USGSGAPDuckDBSource, USGSGAPSource
 import requests
-from shapely.geometry import box
 from functools import cache
 
+if TYPE_CHECKING:
+    import geopandas as gpd
+
+
+logger = logging.getLogger(__name__)
+
+
+# Latin binomials such as "Turdus migratorius", used to skip name resolution
+_BINOMIAL_RE = re.compile(r"[A-Z][a-z]+ [a-z]+(?:-[a-z]+)?")
+
+# Range data sources by name, as accepted by the ``source`` argument; the
+# DuckDB-backed source is only offered when its optional dependency is installed
+_SOURCES: Mapping[str, Type[RangeSource]] = MappingProxyType({
+    "usgs_gap": USGSGAPSource,
+    **({"usgs_gap_duckdb": USGSGAPDuckDBSource} if importlib.util.find_spec("duckdb") else {}),
+})
+
+
+@cache
+def _get_source(name: str) -> RangeSource:
+    """Return the shared instance of a registered source, raising KeyError for unknown names."""
+    return _SOURCES[name]()
+
 
 # Initialize default components
-_resolver = SpeciesNameResolver()
-_default_source = USGSGAPSource()
+_resolver = SpeciesNameResolver(cache_file=os.path.join(pooch.os_cache("rangepy"), "gbif_match.json"))
+_default_source = _get_source("usgs_gap")
 
 
 @cache
 def _get_admin_boundaries(admin_level: str) -> gpd.GeoDataFrame:
     """Get administrative boundaries from Natural Earth data, with caching.
 
+    Boundary files are downloaded once into the user cache directory and kept
+    across interpreter sessions, together with a GeoParquet copy of the parsed
+    data that is loaded instead of the shapefile on later runs.
+
     Args:
         admin_level: Either 'admin0' (countries) or 'admin1' (states/provinces)
         bounds: Optional tuple (minx, miny, maxx, maxy) to filter boundaries
 
     Returns:
-        GeoDataFrame with administrative boundaries
+        GeoDataFrame with administrative boundaries in EPSG:4326
     """
+    import geopandas as gpd
+
     if admin_level == 'admin0':
         # Natural Earth countries (1:110m resolution)
         file_path = "https://naciscdn.org/naturalearth/110m/cultural/ne_110m_admin_0_countries.zip"
@@ -32,13 +68,42 @@ def _get_admin_boundaries(admin_level: str) -> gpd.GeoDataFrame:
     else:
         raise ValueError(f"Unsupported admin_level: {admin_level}. Use 'admin0' or 'admin1'.")
 
+    # Reuse the GeoParquet copy written by a previous run, if any; the columnar
+    # read is much faster than parsing the shapefile again
+    cache_dir = pooch.os_cache("rangepy")
+    zip_name = os.path.basename(file_path)
+    parquet_path = os.path.join(cache_dir, os.path.splitext(zip_name)[0] + ".parquet")
+    if os.path.exists(parquet_path):
+        try:
+            return gpd.read_parquet(parquet_path)
+        except Exception as e:
+            logger.warning("Could not read cached boundary file, re-reading source file: %s", e)
+
     # Download and cache the file using pooch, then read it
     try:
-        admin_gdf = gpd.read_file(file_path)
+        local_path = pooch.retrieve(file_path, known_hash=None, fname=zip_name, path=cache_dir)
+        admin_gdf = gpd.read_file(local_path, engine="pyogrio", use_arrow=True)
     except (requests.exceptions.RequestException, Exception) as e:
-        print(f"Could not download boundary file: {e}")
+        logger.error("Could not download boundary file: %s", e)
         raise IOError(f"Failed to download or read {admin_level} boundaries.") from e
 
+    # Normalize to WGS84 once so callers never need to reproject the cached data
+    if admin_gdf.crs is None or admin_gdf.crs.to_epsg() != 4326:
+        admin_gdf = admin_gdf.to_crs(epsg=4326)
+
+    # Convert to GeoParquet once so subsequent runs can skip the shapefile; write
+    # to a unique file first so concurrent first calls never expose a partial file
+    tmp_path = f"{parquet_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        admin_gdf.to_parquet(tmp_path)
+        os.replace(tmp_path, parquet_path)
+    except Exception as e:
+        logger.warning("Could not write boundary file %s: %s", parquet_path, e)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
     return admin_gdf
 
 
@@ -51,7 +116,10 @@ def get_species_range(
 
     Args:
         species_name: Common or scientific name of the species
-        source: Data source to use (default: "usgs_gap")
+        source: Data source to use (default: "usgs_gap"), see list_available_sources.
+                "usgs_gap_duckdb" additionally keeps ranges in an in-memory DuckDB
+                table, returning only the species metadata columns and the
+                geometry, and is available if duckdb is installed.
         admin_level: Optional. If provided, aggregates range to administrative boundaries.
                     'admin0' for countries, 'admin1' for states/provinces.
                     Any country/state that intersects with the original range will be
@@ -67,111 +135,135 @@ def get_species_range(
         NotImplementedError: If the source is not yet implemented
     """
     # Validate source first
-    if source not in ["usgs_gap"]:
-        raise ValueError(f"Unsupported source: {source}")
-    
-    # First, try searching with the original species name
-    print(f"Searching for species range using original name: '{species_name}'")
-    
-    if source == "usgs_gap":
-        try:
-            # Try with original name first
-            result = _default_source.get_species_range(species_name)
-            if result is not None:
-                print(f"Found species data using original name: '{species_name}'")
+    try:
+        range_source = _get_source(source)
+    except KeyError:
+        raise ValueError(f"Unsupported source: {source}") from None
+
+    try:
+        result = None
+        lookup_error = None
+        if _BINOMIAL_RE.fullmatch(species_name):
+            # Looks like a scientific name, query the source without resolving it first
+            logger.debug("Searching for species range using scientific name: '%s'", species_name)
+            try:
+                result = range_source.get_species_range(species_name)
+            except ValueError as e:
+                # Sentence-case common names such as "Mule deer" match the pattern too
+                logger.debug("No results found for '%s', attempting name resolution...", species_name)
+                lookup_error = e
+
+        if result is None:
+            # Resolve the name first so the source is queried with the scientific name
+            species_info = _resolver.resolve_name(species_name)
+
+            if not species_info:
+                if lookup_error is not None:
+                    raise lookup_error
+                logger.debug("Could not resolve species name, searching with original name: '%s'", species_name)
+                result = range_source.get_species_range(species_name)
+            else:
+                scientific_name = species_info.scientific_name
+                logger.debug("Resolved '%s' to '%s'", species_name, scientific_name)
+                if lookup_error is not None and scientific_name == species_name:
+                    raise lookup_error
+
+                try:
+                    result = range_source.get_species_range(scientific_name)
+                except ValueError:
+                    # Source titles may use older taxonomy than GBIF, so renamed
+                    # taxa can only be found under the name as given
+                    if lookup_error is not None:
+                        raise
+                    logger.debug("No results found for '%s', searching with original name: '%s'", scientific_name, species_name)
+                    result = range_source.get_species_range(species_name)
+                if result is not None:
+                    logger.debug("Found species data using scientific name: '%s'", scientific_name)
+                    # Update the result to include both names
+                    result = result.assign(
+                        original_query=species_name,
+                        common_name=species_info.common_name,
+                    )
+
+        if result is None:
+            logger.info("No species data found for '%s'", species_name)
+            return None
+
+        # If admin_level is specified, aggregate to administrative boundaries
+        if admin_level is not None and result is not None:
+            logger.debug("Aggregating range to %s boundaries...", admin_level)
+
+            # Ensure consistent CRS for intersection
+            original_crs = result.crs
+            is_wgs84 = original_crs is not None and original_crs.to_epsg() == 4326
+            if is_wgs84:
+                result_wgs84 = result
             else:
-                # If no results with original name, try name resolution
-                print(f"No results found with original name, attempting name resolution...")
-                species_info = _resolver.resolve_name(species_name)
-
-                if not species_info:
-                    print(f"Could not resolve species name: {species_name}")
-                    return None
-
-                scientific_name = species_info["scientific_name"]
-                print(f"Resolved '{species_name}' to '{scientific_name}'")
-
-                # Try again with the scientific name
-                if scientific_name != species_name:  # Only search again if names are different
-                    print(f"Searching again with scientific name: '{scientific_name}'")
-                    result = _default_source.get_species_range(scientific_name)
-                    if result is not None:
-                        print(f"Found species data using scientific name: '{scientific_name}'")
-                        # Update the result to include both names
-                        result['original_query'] = species_name
-                        result['common_name'] = species_info.get("common_name", "")
-                    else:
-                        print(f"No species data found for '{species_name}' or '{scientific_name}'")
-                        return None
-                else:
-                    print(f"No species data found for '{species_name}'")
-                    return None
-
-            # If admin_level is specified, aggregate to administrative boundaries
-            if admin_level is not None and result is not None:
-                print(f"Aggregating range to {admin_level} boundaries...")
-
-                # Ensure consistent CRS for intersection
-                original_crs = result.crs
                 result_wgs84 = result.to_crs(epsg=4326)
 
-                # Get bounds of species range to filter admin boundaries
-                bounds = result_wgs84.total_bounds
+            # Get administrative boundaries (already in EPSG:4326)
+            admin_gdf_wgs84 = _get_admin_boundaries(admin_level)
 
-                # Get administrative boundaries
-                admin_gdf = _get_admin_boundaries(admin_level)
-                admin_gdf_wgs84 = admin_gdf.to_crs(epsg=4326)
+            # Find all admin boundaries that intersect with species range; the
+            # bulk query tests all range geometries against the STRtree of the
+            # cached boundaries in one vectorized call, then keeps each matching
+            # boundary once in its original order
+            _, admin_idx = admin_gdf_wgs84.sindex.query(result_wgs84.geometry.values, predicate="intersects")
+            intersecting = admin_gdf_wgs84.iloc[sorted(set(admin_idx.tolist()))]
 
-                # Find all admin boundaries that intersect with species range
-                try:
-                    # Try newer GeoPandas method first
-                    range_union = result_wgs84.union_all()
-                except AttributeError:
-                    # Fall back to deprecated unary_union for older versions
-                    range_union = result_wgs84.unary_union
-                intersecting = admin_gdf_wgs84[admin_gdf_wgs84.intersects(range_union)]
+            if len(intersecting) == 0:
+                logger.warning("No %s boundaries intersect with species range", admin_level)
+                return result
 
-                if len(intersecting) == 0:
-                    print(f"Warning: No {admin_level} boundaries intersect with species range")
-                    return result
+            logger.debug("Found %d %s boundaries intersecting with species range", len(intersecting), admin_level)
 
-                print(f"Found {len(intersecting)} {admin_level} boundaries intersecting with species range")
+            # Transform only the selected boundaries back to the original CRS,
+            # never the full admin dataset
+            if original_crs is not None and not is_wgs84:
+                intersecting = intersecting.to_crs(original_crs)
 
-                # Transform back to original CRS if needed
-                if original_crs is not None:
-                    intersecting = intersecting.to_crs(original_crs)
+            return intersecting
 
-                return intersecting
+        return result
 
-            return result
-            
-        except NotImplementedError as e:
-            raise ValueError(f"USGS GAP source implementation error: {e}")
+    except NotImplementedError as e:
+        raise ValueError(f"{source} source implementation error: {e}")
 
 
-def list_available_sources() -> list:
+@cache
+def list_available_sources() -> tuple:
     """List available range data sources.
     
     Returns:
-        List of available source names
+        Tuple of available source names
     """
-    return ["usgs_gap"]
+    return tuple(_SOURCES)
 
 
-def search_species(query: str, source: str = "usgs_gap") -> list:
+def search_species(query: Union[str, List[str]], source: str = "usgs_gap") -> list:
     """Search for species matching the query.
     
     Args:
-        query: Search term (common or scientific name)
+        query: Search term (common or scientific name), or a list of search terms
+               which are resolved concurrently
         source: Data source to search (default: "usgs_gap")
         
     Returns:
-        List of matching species information
+        List of matching species information. Queries without a match are left
+        out, so for a list of search terms the result is filtered and its entries
+        do not line up with the input; use the resolver's resolve_names for one
+        result per name.
     """
-    # Use the resolver to find species matches
-    species_info = _resolver.resolve_name(query)
-    
-    if species_info:
-        return [species_info]
+    # Use the resolver to find species matches; it answers known names from its
+    # cache and checklist without contacting GBIF
+    if isinstance(query, str):
+        matches = [_resolver.resolve_name(query)]
     else:
-        return []
\ No newline at end of file
+        matches = _resolver.resolve_names(list(query))
+
+    return _search_results(matches)
+
+
+def _search_results(matches: Iterable[Optional[SpeciesMatch]]) -> list:
+    """Convert resolver matches to search results, leaving out names without a match."""
+    return [species_info.as_dict() for species_info in matches if species_info]
@@ -1,14 +1,47 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-import geopandas as gpd
-import requests
-import pandas as pd
-from typing import Optional, Dict, Any, List
-import json
+import atexit
+import logging
+from typing import TYPE_CHECKING, Optional, Dict, Any, List
+import re
 import tempfile
 import os
+import uuid
 import zipfile
 import shutil
+import threading
 from pathlib import Path
+import pooch
+
+if TYPE_CHECKING:
+    import geopandas as gpd
+
+
+logger = logging.getLogger(__name__)
+
+# Item titles that indicate species range data
+_GAP_TITLE_RE = re.compile(r"range|habitat|distribution", re.IGNORECASE)
+
+# File extensions of geospatial files that can be processed
+_GEO_EXTS = frozenset({'.shp', '.geojson', '.json', '.zip'})
+
+# Process-wide parent directory for downloads, created on first use
+_temp_root: Optional[str] = None
+_temp_root_lock = threading.Lock()
+
+
+def _get_temp_root() -> str:
+    """Return the process-wide temporary download directory, creating it if needed.
+
+    The directory and anything left in it are removed when the interpreter exits.
+    """
+    global _temp_root
+    with _temp_root_lock:
+        if _temp_root is None:
+            _temp_root = tempfile.mkdtemp(prefix="rangepy_")
+            atexit.register(shutil.rmtree, _temp_root, ignore_errors=True)
+    return _temp_root
 
 
 class RangeSource(ABC):
@@ -45,19 +78,36 @@ class ScienceBaseGAPSource(RangeSource):
     def __init__(self):
         self.gap_item_id = "5951527de4b062508e3b1e79"  # GAP species range maps item ID
         self.sciencebase_base_url = "https://www.sciencebase.gov"
+        self._session = None
+
+        # Successful ScienceBase responses, keyed by search query and item ID
+        self._search_cache: Dict[str, List[Dict]] = {}
+        self._files_cache: Dict[str, List[Dict]] = {}
+
+        # Processed range maps are stored as GeoParquet files in this directory
+        self.cache_dir = Path(pooch.os_cache("rangepy")) / "ranges"
         
     def _get_sciencebase_session(self):
-        """Create and return a ScienceBase session."""
+        """Return a ScienceBase session, creating it on first use.
+
+        The session is reused by all requests of this source so that its HTTP
+        connections are kept alive between searches and downloads.
+        """
+        if self._session is not None:
+            return self._session
         try:
             import sciencebasepy as sb
-            session = sb.SbSession()
-            return session
+            self._session = sb.SbSession()
+            return self._session
         except ImportError:
-            print("sciencebasepy not installed. Install with: pip install sciencebasepy")
+            logger.error("sciencebasepy not installed. Install with: pip install sciencebasepy")
             return None
     
     def _search_gap_species(self, species_name: str) -> List[Dict]:
         """Search for species in the GAP database via ScienceBase."""
+        if species_name in self._search_cache:
+            return list(self._search_cache[species_name])
+
         session = self._get_sciencebase_session()
         if not session:
             return []
@@ -77,8 +127,7 @@ class ScienceBaseGAPSource(RangeSource):
             if results and 'items' in results:
                 for item in results['items']:
                     # Look for items that contain species range data
-                    if any(keyword in item.get('title', '').lower() 
-                          for keyword in ['range', 'habitat', 'distribution']):
+                    if _GAP_TITLE_RE.search(item.get('title', '')):
                         species_items.append({
                             'id': item.get('id'),
                             'title': item.get('title', ''),
@@ -86,14 +135,18 @@ class ScienceBaseGAPSource(RangeSource):
                             'tags': item.get('tags', [])
                         })
             
-            return species_items
+            self._search_cache[species_name] = species_items
+            return list(species_items)
             
         except Exception as e:
-            print(f"Error searching ScienceBase: {e}")
+            logger.warning("Error searching ScienceBase: %s", e)
             return []
     
     def _download_species_files(self, item_id: str) -> List[Dict]:
         """Get information about files associated with a species item."""
+        if item_id in self._files_cache:
+            return list(self._files_cache[item_id])
+
         session = self._get_sciencebase_session()
         if not session:
             return []
@@ -105,8 +158,7 @@ class ScienceBaseGAPSource(RangeSource):
             available_files = []
             for file_info in files:
                 # Look for geospatial files (shapefiles, GeoJSON, etc.)
-                name = file_info.get('name', '').lower()
-                if any(ext in name for ext in ['.shp', '.geojson', '.json', '.zip']):
+                if Path(file_info.get('name', '')).suffix.lower() in _GEO_EXTS:
                     # Extract file information (no actual download for now)
                     available_files.append({
                         'name': file_info['name'],
@@ -117,99 +169,158 @@ class ScienceBaseGAPSource(RangeSource):
                         'checksum': file_info.get('checksum', {})
                     })
             
-            return available_files
+            self._files_cache[item_id] = available_files
+            return list(available_files)
             
         except Exception as e:
-            print(f"Error accessing files for item {item_id}: {e}")
+            logger.warning("Error accessing files for item %s: %s", item_id, e)
             return []
     
+    def _download_file(self, session, file_info: Dict, temp_dir: str) -> Optional[str]:
+        """Download a single file into temp_dir and return its local path."""
+        try:
+            if not file_info.get('url') and not file_info.get('download_url'):
+                logger.debug("No download URL available for file: %s", file_info['name'])
+                return None
+            
+            # Use the available URL
+            download_url = file_info.get('url') or file_info.get('download_url')
+            local_filename = file_info['name']
+            
+            logger.debug("Downloading %s...", local_filename)
+            session.download_file(download_url, local_filename, destination=temp_dir)
+            return os.path.join(temp_dir, local_filename)
+            
+        except Exception as e:
+            logger.warning("Error downloading file %s: %s", file_info['name'], e)
+            return None
+    
     def _download_and_process_range_files(self, files: List[Dict], temp_dir: str) -> Optional[gpd.GeoDataFrame]:
-        """Download and process range map files to create a GeoDataFrame."""
+        """Download and process range map files to create a GeoDataFrame.
+
+        Files are downloaded and processed one at a time in their original order,
+        the first file that yields a GeoDataFrame wins and later files are never
+        downloaded.
+        """
         session = self._get_sciencebase_session()
         if not session:
             return None
-            
+        
         for file_info in files:
+            local_path = self._download_file(session, file_info, temp_dir)
+            if local_path is None:
+                continue
+            
             try:
-                if not file_info.get('url') and not file_info.get('download_url'):
-                    print(f"No download URL available for file: {file_info['name']}")
-                    continue
-                
-                # Use the available URL
-                download_url = file_info.get('url') or file_info.get('download_url')
-                local_filename = file_info['name']
-                local_path = os.path.join(temp_dir, local_filename)
-                
-                print(f"Downloading {local_filename}...")
-                session.download_file(download_url, local_filename, destination=temp_dir)
-                
                 # Process the downloaded file
                 gdf = self._process_geospatial_file(local_path, file_info)
                 if gdf is not None:
                     return gdf
                     
             except Exception as e:
-                print(f"Error downloading/processing file {file_info['name']}: {e}")
+                logger.warning("Error processing file %s: %s", file_info['name'], e)
                 continue
         
         return None
     
     def _process_geospatial_file(self, file_path: str, file_info: Dict) -> Optional[gpd.GeoDataFrame]:
         """Process a downloaded geospatial file into a GeoDataFrame."""
+        import geopandas as gpd
+
         try:
             path_obj = Path(file_path)
             
             if not path_obj.exists():
-                print(f"Downloaded file not found: {path_obj}")
+                logger.warning("Downloaded file not found: %s", path_obj)
                 return None
             
             # Handle different file types
             if path_obj.suffix.lower() == '.zip':
                 return self._process_zip_file(path_obj, file_info)
             elif path_obj.suffix.lower() == '.geojson':
-                return gpd.read_file(file_path)
+                return gpd.read_file(file_path, engine="pyogrio", use_arrow=True)
             elif path_obj.suffix.lower() == '.shp':
-                return gpd.read_file(file_path)
+                return gpd.read_file(file_path, engine="pyogrio", use_arrow=True)
             else:
-                print(f"Unsupported file format: {path_obj.suffix}")
+                logger.debug("Unsupported file format: %s", path_obj.suffix)
                 return None
                 
         except Exception as e:
-            print(f"Error processing geospatial file {file_path}: {e}")
+            logger.warning("Error processing geospatial file %s: %s", file_path, e)
             return None
     
     def _process_zip_file(self, zip_path: Path, file_info: Dict) -> Optional[gpd.GeoDataFrame]:
-        """Extract and process a ZIP file containing geospatial data."""
+        """Read geospatial data directly from a ZIP file without extracting it."""
+        import geopandas as gpd
+
         try:
-            extract_dir = zip_path.parent / f"{zip_path.stem}_extracted"
-            extract_dir.mkdir(exist_ok=True)
-            
-            # Extract the ZIP file
             with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
+                members = zip_ref.namelist()
             
-            # Look for shapefiles or GeoJSON files in the extracted content
-            for extracted_file in extract_dir.rglob('*'):
-                if extracted_file.suffix.lower() in ['.shp', '.geojson']:
-                    print(f"Processing extracted file: {extracted_file.name}")
-                    gdf = gpd.read_file(extracted_file)
-                    
-                    # Add metadata from the original file info
-                    gdf['source_file'] = file_info['name']
-                    gdf['download_url'] = file_info.get('url', '')
-                    gdf['file_size'] = file_info.get('size', 0)
-                    
-                    return gdf
+            # Look for a shapefile, or a GeoJSON file if the archive has no shapefile
+            member = (
+                next((m for m in members if m.lower().endswith('.shp')), None)
+                or next((m for m in members if m.lower().endswith('.geojson')), None)
+            )
+            if member is not None:
+                logger.debug("Processing file from ZIP: %s", member)
+                # GDAL reads the member in place through its virtual ZIP file system
+                gdf = gpd.read_file(f"zip://{zip_path.as_posix()}!{member}", engine="pyogrio", use_arrow=True)
+                
+                # Add metadata from the original file info
+                return gdf.assign(
+                    source_file=file_info['name'],
+                    download_url=file_info.get('url', ''),
+                    file_size=file_info.get('size', 0),
+                )
             
-            print(f"No geospatial files found in ZIP: {zip_path}")
+            logger.warning("No geospatial files found in ZIP: %s", zip_path)
             return None
             
         except Exception as e:
-            print(f"Error processing ZIP file {zip_path}: {e}")
+            logger.warning("Error processing ZIP file %s: %s", zip_path, e)
             return None
     
+    def _cache_path(self, species_name: str) -> Path:
+        """Return the GeoParquet file caching the range of a species.
+
+        Cached ranges are keyed by the GAP collection and the normalized queried name.
+        """
+        file_name = re.sub(r'[^a-z0-9]+', '_', species_name.strip().lower())
+        return self.cache_dir / self.gap_item_id / f"{file_name}.parquet"
+
+    def _read_cached_range(self, cache_path: Path) -> Optional[gpd.GeoDataFrame]:
+        """Load a previously processed range map, or return None if there is none."""
+        if not cache_path.exists():
+            return None
+
+        import geopandas as gpd
+
+        try:
+            return gpd.read_parquet(cache_path)
+        except Exception as e:
+            logger.warning("Could not read cached range map %s: %s", cache_path, e)
+            return None
+
+    def _write_cached_range(self, range_gdf: gpd.GeoDataFrame, cache_path: Path):
+        """Store a processed range map so later calls can skip download and parsing."""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a unique file first so concurrent writers never expose a partial file
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{uuid.uuid4().hex}.tmp")
+            range_gdf.to_parquet(tmp_path, compression="zstd")
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning("Could not write cached range map %s: %s", cache_path, e)
+
     def get_species_range(self, species_name: str) -> Optional[gpd.GeoDataFrame]:
         """Get species range from ScienceBase GAP Analysis data."""
+        cache_path = self._cache_path(species_name)
+        range_gdf = self._read_cached_range(cache_path)
+        if range_gdf is not None:
+            logger.debug("Loaded cached range map for %s from %s", species_name, cache_path)
+            return range_gdf
+
         temp_dir = None
         try:
             # Search for the species in ScienceBase
@@ -225,10 +336,10 @@ class ScienceBaseGAPSource(RangeSource):
             if not files:
                 raise ValueError(f"No geospatial files found for species: {species_name}")
             
-            print(f"Found {len(files)} geospatial file(s) for {species_name}")
+            logger.debug("Found %d geospatial file(s) for %s", len(files), species_name)
             
-            # Create temporary directory for downloads
-            temp_dir = tempfile.mkdtemp(prefix=f"rangepy_{species_name.replace(' ', '_')}_")
+            # Create temporary directory for downloads inside the shared download directory
+            temp_dir = tempfile.mkdtemp(prefix=f"{species_name.replace(' ', '_')}_", dir=_get_temp_root())
             
             # Download and process the actual range data
             range_gdf = self._download_and_process_range_files(files, temp_dir)
@@ -237,31 +348,34 @@ class ScienceBaseGAPSource(RangeSource):
                 raise ValueError(f"Failed to download or process range data for species: {species_name}")
             
             # Add species metadata to the GeoDataFrame
-            range_gdf['species_name'] = species_name
-            range_gdf['source'] = 'sciencebase_gap'
-            range_gdf['item_id'] = first_item['id']
-            range_gdf['title'] = first_item['title']
+            range_gdf = range_gdf.assign(
+                species_name=species_name,
+                source='sciencebase_gap',
+                item_id=first_item['id'],
+                title=first_item['title'],
+            )
             
-            print(f"Successfully loaded range map for {species_name} with {len(range_gdf)} features")
+            logger.debug("Successfully loaded range map for %s with %d features", species_name, len(range_gdf))
             
             # Ensure we have a proper CRS
             if range_gdf.crs is None:
-                print("No CRS found in data, assuming EPSG:4326 (WGS84)")
+                logger.warning("No CRS found in data, assuming EPSG:4326 (WGS84)")
                 range_gdf.set_crs('EPSG:4326', inplace=True)
             
+            self._write_cached_range(range_gdf, cache_path)
             return range_gdf
             
         except Exception as e:
-            print(f"Error retrieving species range from ScienceBase: {e}")
+            logger.debug("Error retrieving species range from ScienceBase: %s", e)
             raise
         finally:
             # Clean up temporary files
             if temp_dir and os.path.exists(temp_dir):
                 try:
                     shutil.rmtree(temp_dir)
-                    print(f"Cleaned up temporary directory: {temp_dir}")
+                    logger.debug("Cleaned up temporary directory: %s", temp_dir)
                 except Exception as cleanup_error:
-                    print(f"Warning: Failed to clean up temporary directory {temp_dir}: {cleanup_error}")
+                    logger.warning("Failed to clean up temporary directory %s: %s", temp_dir, cleanup_error)
     
     def search_species(self, query: str) -> list:
         """Search for species in ScienceBase GAP database."""
@@ -270,9 +384,121 @@ class ScienceBaseGAPSource(RangeSource):
             return [{'title': item['title'], 'id': item['id'], 'summary': item['summary']} 
                    for item in species_items]
         except Exception as e:
-            print(f"Error searching species in ScienceBase: {e}")
+            logger.warning("Error searching species in ScienceBase: %s", e)
             return []
 
 
+class USGSGAPDuckDBSource(ScienceBaseGAPSource):
+    """USGS GAP species range source keeping processed ranges in a DuckDB table.
+
+    Ranges missing from the ``gap`` table are loaded like in the parent class,
+    from the GeoParquet cache or else from ScienceBase, and stored in the table;
+    later requests are answered by a single query. Only the geometry (as WKB)
+    and the species metadata columns are stored, so only those are returned.
+    Requires the optional ``duckdb`` dependency. Call ``close()`` or use the source as a context
+    manager to release the database.
+    """
+
+    def __init__(self, database: str = ":memory:"):
+        """Initialize the source.
+
+        Args:
+            database: Path of the DuckDB database file, or ":memory:" for a
+                      database that only lives as long as this source
+        """
+        super().__init__()
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("duckdb not installed. Install with: pip install duckdb") from e
+
+        self.con = duckdb.connect(database)
+        self.con.execute(
+            "CREATE TABLE IF NOT EXISTS gap ("
+            "query VARCHAR, species_name VARCHAR, source VARCHAR, item_id VARCHAR, "
+            "title VARCHAR, crs VARCHAR, geometry BLOB)"
+        )
+        # DuckDB connections must not be used from several threads at once
+        self._con_lock = threading.Lock()
+
+    def close(self):
+        """Close the database connection."""
+        with self._con_lock:
+            self.con.close()
+
+    def __enter__(self) -> "USGSGAPDuckDBSource":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _query_key(species_name: str) -> str:
+        """Normalize a species name for lookups in the gap table."""
+        return " ".join(species_name.split()).casefold()
+
+    def add_range(self, species_name: str, range_gdf: gpd.GeoDataFrame):
+        """Store the range of a species in the gap table."""
+        import pandas as pd
+
+        rows = pd.DataFrame({
+            'query': self._query_key(species_name),
+            'species_name': range_gdf['species_name'] if 'species_name' in range_gdf else species_name,
+            'source': range_gdf['source'] if 'source' in range_gdf else None,
+            'item_id': range_gdf['item_id'] if 'item_id' in range_gdf else None,
+            'title': range_gdf['title'] if 'title' in range_gdf else None,
+            'crs': range_gdf.crs.to_wkt() if range_gdf.crs is not None else None,
+            'geometry': range_gdf.geometry.to_wkb(),
+        })
+        with self._con_lock:
+            self.con.register('new_ranges', rows)
+            try:
+                self.con.execute("INSERT INTO gap SELECT * FROM new_ranges")
+            finally:
+                self.con.unregister('new_ranges')
+
+    def _load_range(self, species_name: str) -> Optional[gpd.GeoDataFrame]:
+        """Load the range of a species from the gap table, None if it is not stored."""
+        import geopandas as gpd
+
+        with self._con_lock:
+            rows = self.con.execute(
+                "SELECT species_name, source, item_id, title, crs, geometry FROM gap WHERE query = ?",
+                [self._query_key(species_name)],
+            ).fetchall()
+
+        if not rows:
+            return None
+
+        species_names, sources, item_ids, titles, crs, geometries = zip(*rows)
+        return gpd.GeoDataFrame(
+            {
+                'species_name': list(species_names),
+                'source': list(sources),
+                'item_id': list(item_ids),
+                'title': list(titles),
+            },
+            geometry=gpd.GeoSeries.from_wkb(
+                [bytes(geometry) if geometry is not None else None for geometry in geometries]
+            ),
+            crs=crs[0],
+        )
+
+    def get_species_range(self, species_name: str) -> Optional[gpd.GeoDataFrame]:
+        """Get species range from the gap table, fetching it from ScienceBase if missing."""
+        range_gdf = self._load_range(species_name)
+        if range_gdf is not None:
+            logger.debug("Loaded range map for %s from DuckDB", species_name)
+            return range_gdf
+
+        range_gdf = super().get_species_range(species_name)
+        if range_gdf is None:
+            return None
+
+        # Return the stored columns, so a range looks the same on every request
+        self.add_range(species_name, range_gdf)
+        return self._load_range(species_name)
+
+
 # Keep the old class name for backward compatibility but use the new implementation
 USGSGAPSource = ScienceBaseGAPSource
\ No newline at end of file
@@ -1,55 +1,289 @@
+import atexit
+import csv
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from importlib.resources import files
 import requests
-from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional, Dict, Any, Iterator, KeysView, List
+
+
+logger = logging.getLogger(__name__)
+
+# Retries of GBIF requests, also on transient gateway errors which GBIF returns under load
+_MAX_RETRIES = 3
+_RETRY_BACKOFF = 0.3
+_RETRY_STATUSES = (502, 503, 504)
+
+
+@dataclass(frozen=True)
+class SpeciesMatch:
+    """Taxonomic information for a resolved species name."""
+
+    __slots__ = (
+        "scientific_name", "common_name", "kingdom", "phylum", "class_",
+        "order", "family", "genus", "species", "confidence",
+    )
+
+    scientific_name: str
+    common_name: str
+    kingdom: str
+    phylum: str
+    class_: str
+    order: str
+    family: str
+    genus: str
+    species: str
+    confidence: int
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SpeciesMatch":
+        """Create a match from a dict as returned by as_dict, missing keys default to empty."""
+        return cls(
+            scientific_name=data["scientific_name"],
+            common_name=data.get("common_name", ""),
+            kingdom=data.get("kingdom", ""),
+            phylum=data.get("phylum", ""),
+            class_=data.get("class", ""),
+            order=data.get("order", ""),
+            family=data.get("family", ""),
+            genus=data.get("genus", ""),
+            species=data.get("species", ""),
+            confidence=data.get("confidence", 0),
+        )
+
+    def __getstate__(self):
+        # Frozen dataclasses with __slots__ cannot be restored by the default
+        # pickle/copy protocol, which sets attributes through __setattr__
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+    def __getitem__(self, key: str) -> Any:
+        """Support dict-style access such as match["scientific_name"] for older callers."""
+        try:
+            return self.as_dict()[key]
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.as_dict()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.as_dict())
+
+    def keys(self) -> KeysView[str]:
+        return self.as_dict().keys()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style get, returning default for unknown keys."""
+        return self.as_dict().get(key, default)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the match as a plain dict, using "class" for the class rank."""
+        return {
+            "scientific_name": self.scientific_name,
+            "common_name": self.common_name,
+            "kingdom": self.kingdom,
+            "phylum": self.phylum,
+            "class": self.class_,
+            "order": self.order,
+            "family": self.family,
+            "genus": self.genus,
+            "species": self.species,
+            "confidence": self.confidence,
+        }
+
+
+@cache
+def _load_checklist() -> Dict[str, SpeciesMatch]:
+    """Load the bundled checklist of common species, keyed by normalized common and scientific name."""
+    checklist: Dict[str, SpeciesMatch] = {}
+    with (files("rangepy") / "data" / "checklist.csv").open("r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            match = SpeciesMatch.from_dict({**row, "confidence": 100})
+            checklist[SpeciesNameResolver._cache_key(match.common_name)] = match
+            checklist[SpeciesNameResolver._cache_key(match.scientific_name)] = match
+    return checklist
 
 
 class SpeciesNameResolver:
     """Resolves common names to scientific names using taxonomic databases."""
     
-    def __init__(self):
+    def __init__(self, cache_file: Optional[str] = None, use_checklist: bool = True):
+        """Initialize the resolver.
+
+        Args:
+            cache_file: Optional path of a JSON file used to persist resolved names
+                        across sessions. Without it, results are only cached in memory.
+            use_checklist: Whether to answer names found in the bundled checklist of
+                           common species locally instead of querying GBIF.
+        """
         # Using GBIF API for name resolution
         self.gbif_api_base = "https://api.gbif.org/v1"
-        
-    def resolve_name(self, name: str) -> Optional[Dict[str, Any]]:
+        self._match_url = f"{self.gbif_api_base}/species/match"
+        self.cache_file = cache_file
+        self.use_checklist = use_checklist
+
+        # Reuse connections across lookups instead of a new TCP/TLS handshake per call
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(total=_MAX_RETRIES, backoff_factor=_RETRY_BACKOFF, status_forcelist=_RETRY_STATUSES),
+        ))
+
+        # Resolved names keyed by normalized query, None marks names without a match
+        self._matches: Dict[str, Optional[SpeciesMatch]] = {}
+        self._cache_modified = False
+        if cache_file is not None:
+            self._load_cache()
+            atexit.register(self._save_cache)
+
+    @staticmethod
+    def _cache_key(name: str) -> str:
+        """Normalize a query so that trivially different spellings share a cache entry."""
+        return " ".join(name.split()).casefold()
+
+    def _lookup(self, key: str) -> Optional[SpeciesMatch]:
+        """Return the known result for a normalized name, raising KeyError if GBIF must be asked."""
+        if key in self._matches:
+            return self._matches[key]
+        if self.use_checklist:
+            return _load_checklist()[key]
+        raise KeyError(key)
+
+    def invalidate(self):
+        """Forget all cached lookups, including those persisted in the cache file."""
+        self._matches.clear()
+        self._cache_modified = True
+
+    def _load_cache(self):
+        """Load previously resolved names from the cache file."""
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            matches = {
+                key: SpeciesMatch.from_dict(match) if match is not None else None
+                for key, match in cached.items()
+            }
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, AttributeError, TypeError) as e:
+            # Drop an unreadable or malformed cache, it is overwritten on the next save
+            logger.warning("Could not load species name cache %s: %s", self.cache_file, e)
+            self._cache_modified = True
+            return
+        self._matches.update(matches)
+
+    def _save_cache(self):
+        """Write resolved names to the cache file if anything changed."""
+        if not self._cache_modified:
+            return
+        # Write to a unique file first so concurrent processes never expose a partial file
+        tmp_file = f"{self.cache_file}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_file)), exist_ok=True)
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({
+                    key: match.as_dict() if match is not None else None
+                    for key, match in self._matches.items()
+                }, f)
+            os.replace(tmp_file, self.cache_file)
+            self._cache_modified = False
+        except OSError as e:
+            logger.warning("Could not write species name cache %s: %s", self.cache_file, e)
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _parse_match(data: Dict[str, Any]) -> Optional[SpeciesMatch]:
+        """Convert a GBIF species match response, returning None unless it is a good match."""
+        if data.get("matchType") in ["EXACT", "FUZZY"] and data.get("canonicalName"):
+            return SpeciesMatch(
+                scientific_name=data.get("canonicalName"),
+                common_name=data.get("vernacularName", ""),
+                kingdom=data.get("kingdom", ""),
+                phylum=data.get("phylum", ""),
+                class_=data.get("class", ""),
+                order=data.get("order", ""),
+                family=data.get("family", ""),
+                genus=data.get("genus", ""),
+                species=data.get("species", ""),
+                confidence=data.get("confidence", 0)
+            )
+        return None
+
+    def _remember(self, key: str, match: Optional[SpeciesMatch]):
+        """Cache the outcome of a completed lookup under its normalized key."""
+        self._matches[key] = match
+        self._cache_modified = True
+
+    def resolve_name(self, name: str) -> Optional[SpeciesMatch]:
         """Resolve a species name to standardized taxonomic information.
         
         Args:
             name: Common or scientific name
             
         Returns:
-            Dict with species information or None if not found
+            SpeciesMatch with species information or None if not found
         """
+        key = self._cache_key(name)
+        try:
+            return self._lookup(key)
+        except KeyError:
+            pass
+
         try:
             # Try to match the name using GBIF species match API
-            url = f"{self.gbif_api_base}/species/match"
-            params = {"name": name}
-            
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(self._match_url, params={"name": name}, timeout=10)
             response.raise_for_status()
             
             data = response.json()
-
-            print(data)
+            logger.debug("GBIF match response for '%s': %s", name, data)
             
-            # Check if we got a good match
-            if data.get("matchType") in ["EXACT", "FUZZY"] and data.get("canonicalName"):
-                return {
-                    "scientific_name": data.get("canonicalName"),
-                    "common_name": data.get("vernacularName", ""),
-                    "kingdom": data.get("kingdom", ""),
-                    "phylum": data.get("phylum", ""),
-                    "class": data.get("class", ""),
-                    "order": data.get("order", ""),
-                    "family": data.get("family", ""),
-                    "genus": data.get("genus", ""),
-                    "species": data.get("species", ""),
-                    "confidence": data.get("confidence", 0)
-                }
+            # Only successful lookups are cached, errors are retried on the next call
+            match = self._parse_match(data)
+            self._remember(key, match)
+            return match
                 
         except Exception as e:
-            print(f"Error resolving species name '{name}': {e}")
+            logger.warning("Error resolving species name '%s': %s", name, e)
             
         return None
     
+    def resolve_names(self, names: List[str], max_workers: int = 8) -> List[Optional[SpeciesMatch]]:
+        """Resolve several species names concurrently.
+
+        Each distinct name is looked up once, lookups run in parallel threads
+        sharing the resolver's connection pool.
+
+        Args:
+            names: Common or scientific names
+            max_workers: Maximum number of concurrent GBIF requests
+
+        Returns:
+            List with the resolve_name result for each name, in input order
+        """
+        unique_names = list(dict.fromkeys(names))
+        if not unique_names:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_names))) as executor:
+            resolved = dict(zip(unique_names, executor.map(self.resolve_name, unique_names)))
+
+        return [resolved[name] for name in names]
+    
     def get_scientific_name(self, name: str) -> Optional[str]:
         """Get the scientific name for a given common or scientific name.
         
@@ -60,4 +294,4 @@ class SpeciesNameResolver:
             Scientific name or None if not found
         """
         result = self.resolve_name(name)
-        return result["scientific_name"] if result else None
\ No newline at end of file
+        return result.scientific_name if result else None
\ No newline at end of file
@@ -0,0 +1,27 @@
+from dataclasses import dataclass, field
+import pytest
+
+
+@dataclass
+class FakeResponse:
+    """Minimal stand-in for requests.Response returning a fixed JSON payload."""
+
+    json_data: dict = field(default_factory=dict)
+    status_code: int = 200
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.json_data
+
+
+@pytest.fixture
+def fake_response():
+    """Factory fixture creating FakeResponse objects from a JSON payload."""
+    return FakeResponse
+
+
+def first(values):
+    """Return the first element of a Series via its NumPy array, skipping the pandas indexer."""
+    return values.to_numpy()[0]
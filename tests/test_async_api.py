@@ -0,0 +1,117 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from rangepy import core
+from rangepy.core import search_species
+from rangepy.species_resolver import SpeciesNameResolver
+
+httpx = pytest.importorskip("httpx")
+
+from rangepy.async_api import aget_species_range, aresolve_name, search_species_bulk, search_species_bulk_sync
+
+
+@pytest.fixture(autouse=True)
+def resolver():
+    """Fresh in-memory resolver, so the user's cache is neither used nor modified."""
+    with patch.object(core, "_resolver", SpeciesNameResolver(use_checklist=False)) as resolver:
+        yield resolver
+
+
+class TestAsyncAPI:
+    """Test cases for the asynchronous API."""
+
+    @patch('httpx.AsyncClient.get', new_callable=AsyncMock)
+    def test_aresolve_name(self, mock_get, resolver, fake_response):
+        """Test resolving a name and caching it in the shared resolver."""
+        mock_get.return_value = fake_response({
+            "matchType": "EXACT",
+            "canonicalName": "Turdus migratorius",
+            "vernacularName": "American Robin"
+        })
+
+        # Test the function twice
+        result = asyncio.run(aresolve_name("American Robin"))
+        cached = asyncio.run(aresolve_name("american robin"))
+
+        # Verify the result and that the second lookup was served from the cache
+        assert result.scientific_name == "Turdus migratorius"
+        assert cached == result
+        mock_get.assert_called_once()
+        assert mock_get.call_args[1]["params"]["name"] == "American Robin"
+        assert resolver.resolve_name("American Robin") == result
+
+    @patch('httpx.AsyncClient.get', new_callable=AsyncMock)
+    def test_aresolve_name_api_error(self, mock_get):
+        """Test name resolution with API error."""
+        mock_get.side_effect = httpx.ConnectError("API Error")
+
+        # Test the function
+        result = asyncio.run(aresolve_name("American Robin"))
+
+        # Verify the result
+        assert result is None
+
+    @patch('rangepy.async_api.asyncio.sleep', new_callable=AsyncMock)
+    @patch('httpx.AsyncClient.get', new_callable=AsyncMock)
+    def test_aresolve_name_retries_gateway_errors(self, mock_get, mock_sleep, fake_response):
+        """Test that transient gateway errors are retried."""
+        mock_get.side_effect = [
+            fake_response(status_code=503),
+            fake_response({"matchType": "EXACT", "canonicalName": "Turdus migratorius"}),
+        ]
+        
+        # Test the function
+        result = asyncio.run(aresolve_name("American Robin"))
+        
+        # Verify the lookup succeeded on the second attempt
+        assert result.scientific_name == "Turdus migratorius"
+        assert mock_get.call_count == 2
+        mock_sleep.assert_awaited_once()
+    
+    @patch('httpx.AsyncClient.get', new_callable=AsyncMock)
+    def test_search_species_bulk(self, mock_get, fake_response):
+        """Test searching several names concurrently."""
+        # Mock API responses depending on the queried name
+        async def respond(url, params):
+            if params["name"] == "American Robin":
+                return fake_response({
+                    "matchType": "EXACT",
+                    "canonicalName": "Turdus migratorius",
+                    "vernacularName": "American Robin"
+                })
+            return fake_response({"matchType": "NONE"})
+        mock_get.side_effect = respond
+
+        # Test the function with a duplicated name
+        results = asyncio.run(search_species_bulk(["American Robin", "Invalid Species", "American Robin"]))
+
+        # Verify matches are in input order and each distinct name was looked up once
+        assert [r["scientific_name"] for r in results] == ["Turdus migratorius", "Turdus migratorius"]
+        assert mock_get.call_count == 2
+
+    @patch('rangepy.species_resolver.requests.Session.get')
+    @patch('httpx.AsyncClient.get', new_callable=AsyncMock)
+    def test_search_species_bulk_matches_sync_api(self, mock_get, mock_sync_get, resolver, fake_response):
+        """Test that the async and sync searches return the same results."""
+        mock_get.return_value = mock_sync_get.return_value = fake_response({"matchType": "NONE"})
+        names = ["Xus yus", "Invalid Species"]
+        
+        # Test both functions
+        async_results = search_species_bulk_sync(names)
+        resolver.invalidate()
+        sync_results = search_species(names)
+        
+        # Verify the results
+        assert async_results == sync_results == []
+    
+    @patch('rangepy.core.get_species_range')
+    def test_aget_species_range(self, mock_get_range):
+        """Test that range retrieval is delegated to the synchronous API."""
+        mock_get_range.return_value = None
+
+        # Test the function
+        result = asyncio.run(aget_species_range("Turdus migratorius", admin_level="admin1"))
+
+        # Verify the result
+        assert result is None
+        mock_get_range.assert_called_once_with("Turdus migratorius", "usgs_gap", "admin1")
@@ -1,7 +1,9 @@
 import pytest
-import geopandas as gpd
 from unittest.mock import patch, MagicMock
+from rangepy import core
 from rangepy.core import get_species_range, list_available_sources, search_species
+from rangepy.species_resolver import SpeciesMatch
+from .conftest import first
 
 
 class TestCore:
@@ -10,18 +12,23 @@ class TestCore:
     def test_list_available_sources(self):
         """Test that available sources are returned."""
         sources = list_available_sources()
-        assert isinstance(sources, list)
+        assert isinstance(sources, tuple)
         assert "usgs_gap" in sources
     
     @patch('rangepy.core._resolver.resolve_name')
-    def test_get_species_range_with_valid_species(self, mock_resolve):
+    def test_get_species_range_with_valid_species(self, mock_resolve, tmp_path, monkeypatch):
         """Test getting species range with a valid species name."""
+        import geopandas as gpd
+        
+        # Keep the user's range cache out of the test
+        monkeypatch.setattr(core._default_source, "cache_dir", tmp_path)
+        
         # Mock the species resolver
-        mock_resolve.return_value = {
+        mock_resolve.return_value = SpeciesMatch.from_dict({
             "scientific_name": "Turdus migratorius",
             "common_name": "American Robin",
             "kingdom": "Animalia"
-        }
+        })
         
         # Test the function
         result = get_species_range("American Robin")
@@ -31,12 +38,14 @@ class TestCore:
         assert len(result) > 0
         assert "species_name" in result.columns
         assert "geometry" in result.columns
-        # Now it should use the original name first if found
-        assert result["species_name"].iloc[0] == "American Robin"
+        # Common names are resolved before querying the source
+        assert first(result["species_name"]) == "Turdus migratorius"
+        assert first(result["original_query"]) == "American Robin"
     
     @patch('rangepy.core._resolver.resolve_name')
-    def test_get_species_range_with_invalid_species(self, mock_resolve):
+    def test_get_species_range_with_invalid_species(self, mock_resolve, tmp_path, monkeypatch):
         """Test getting species range with an invalid species name."""
+        monkeypatch.setattr(core._default_source, "cache_dir", tmp_path)
         # Mock the species resolver to return None
         mock_resolve.return_value = None
         
@@ -44,6 +53,67 @@ class TestCore:
         with pytest.raises(ValueError, match="No species data found in ScienceBase"):
             get_species_range("Invalid Species Name")
     
+    @patch('rangepy.core._default_source.get_species_range')
+    @patch('rangepy.core._resolver.resolve_name')
+    def test_get_species_range_with_scientific_name(self, mock_resolve, mock_get_range):
+        """Test that scientific names are looked up without name resolution."""
+        mock_get_range.return_value = MagicMock()
+        
+        # Test the function
+        result = get_species_range("Turdus migratorius")
+        
+        # Verify the source was queried directly
+        assert result is mock_get_range.return_value
+        mock_get_range.assert_called_once_with("Turdus migratorius")
+        mock_resolve.assert_not_called()
+    
+    @patch('rangepy.core._default_source.get_species_range')
+    @patch('rangepy.core._resolver.resolve_name')
+    def test_get_species_range_falls_back_to_original_name(self, mock_resolve, mock_get_range):
+        """Test that the name as given is tried when the resolved scientific name is not found."""
+        # GBIF uses the current name, the source only knows the older one
+        mock_resolve.return_value = SpeciesMatch.from_dict({
+            "scientific_name": "Spizelloides arborea",
+            "common_name": "American Tree Sparrow"
+        })
+        range_gdf = MagicMock()
+        mock_get_range.side_effect = [ValueError("No species data found"), range_gdf]
+        
+        # Test the function
+        result = get_species_range("American Tree Sparrow")
+        
+        # Verify both names were tried in order
+        assert [c.args[0] for c in mock_get_range.call_args_list] == ["Spizelloides arborea", "American Tree Sparrow"]
+        assert result is range_gdf.assign.return_value
+    
+    @patch('rangepy.core._get_admin_boundaries')
+    @patch('rangepy.core._default_source.get_species_range')
+    def test_get_species_range_with_admin_level(self, mock_get_range, mock_admin):
+        """Test aggregating a range to the administrative boundaries it intersects."""
+        import geopandas as gpd
+        from shapely.geometry import box
+        
+        admin_gdf = gpd.GeoDataFrame(
+            {"name": ["A", "B", "C"]},
+            geometry=[box(0, 0, 1, 1), box(1, 0, 2, 1), box(5, 5, 6, 6)],
+            crs="EPSG:4326",
+        )
+        mock_admin.return_value = admin_gdf
+        mock_get_range.return_value = gpd.GeoDataFrame(
+            geometry=[box(0.2, 0.2, 0.8, 0.8), box(1.2, 0.2, 1.5, 0.5)],
+            crs="EPSG:4326",
+        )
+        
+        # Test the function
+        result = get_species_range("Turdus migratorius", admin_level="admin1")
+        
+        # Verify the intersecting boundaries are returned in their original order
+        assert list(result["name"]) == ["A", "B"]
+        # The spatial index stays with the cached boundaries, the returned subset
+        # must not carry one over the full boundary set
+        assert admin_gdf.has_sindex
+        assert not result.has_sindex
+    
     def test_get_species_range_with_invalid_source(self):
         """Test getting species range with an invalid source."""
         with pytest.raises(ValueError, match="Unsupported source"):
@@ -53,11 +123,11 @@ class TestCore:
     def test_search_species(self, mock_resolve):
         """Test species search functionality."""
         # Mock the species resolver
-        mock_resolve.return_value = {
+        mock_resolve.return_value = SpeciesMatch.from_dict({
             "scientific_name": "Turdus migratorius",
             "common_name": "American Robin",
             "kingdom": "Animalia"
-        }
+        })
         
         # Test the function
         result = search_species("robin")
@@ -67,6 +137,60 @@ class TestCore:
         assert len(result) == 1
         assert result[0]["scientific_name"] == "Turdus migratorius"
     
+    @patch('rangepy.core._resolver.resolve_name')
+    def test_search_species_unresolved_binomial(self, mock_resolve):
+        """Test that unresolved names shaped like a binomial are not reported as matches."""
+        mock_resolve.return_value = None
+        
+        # Test the function
+        result = search_species("Nonexistent species")
+        
+        # Verify the result
+        assert result == []
+    
+    @patch('rangepy.core._resolver.resolve_name')
+    def test_search_species_sentence_case_common_name(self, mock_resolve):
+        """Test that common names shaped like a binomial are resolved, not echoed back."""
+        mock_resolve.return_value = SpeciesMatch.from_dict({
+            "scientific_name": "Odocoileus hemionus",
+            "common_name": "Mule Deer"
+        })
+        
+        # Test the function
+        result = search_species("Mule deer")
+        
+        # Verify the result
+        mock_resolve.assert_called_once_with("Mule deer")
+        assert len(result) == 1
+        assert result[0]["scientific_name"] == "Odocoileus hemionus"
+    
+    @patch('rangepy.core._resolver.resolve_names')
+    def test_search_species_list(self, mock_resolve_names):
+        """Test species search with a list of names."""
+        # Mock the species resolver
+        mock_resolve_names.return_value = [
+            SpeciesMatch.from_dict({"scientific_name": "Turdus migratorius"}),
+            None,
+        ]
+        
+        # Test the function
+        result = search_species(["robin", "nonexistent species"])
+        
+        # Verify only the resolved name is returned
+        mock_resolve_names.assert_called_once_with(["robin", "nonexistent species"])
+        assert len(result) == 1
+        assert result[0]["scientific_name"] == "Turdus migratorius"
+    
+    @patch('rangepy.core._resolver.resolve_names')
+    @patch('rangepy.core._resolver.resolve_name')
+    def test_search_species_list_unresolved_binomial(self, mock_resolve, mock_resolve_names):
+        """Test that unresolved names are left out the same way for lists and strings."""
+        mock_resolve.return_value = None
+        mock_resolve_names.return_value = [None]
+        
+        # Test the function
+        assert search_species(["Nonexistent species"]) == search_species("Nonexistent species") == []
+    
     @patch('rangepy.core._resolver.resolve_name')
     def test_search_species_no_results(self, mock_resolve):
         """Test species search with no results."""
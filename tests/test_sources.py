@@ -1,6 +1,9 @@
+import json
+import zipfile
 import pytest
-from unittest.mock import patch
-from rangepy.sources import RangeSource, USGSGAPSource
+from unittest.mock import patch, MagicMock
+from rangepy.sources import RangeSource, USGSGAPSource, USGSGAPDuckDBSource
+from .conftest import first
 
 
 class TestRangeSource:
@@ -12,29 +15,257 @@ class TestRangeSource:
             RangeSource()
 
 
+@pytest.fixture(scope="class")
+def shared_source():
+    """Source instance shared by all tests in a class."""
+    return USGSGAPSource()
+
+
+@pytest.fixture
+def source(shared_source):
+    """Shared source with empty in-memory caches, so mocked sessions are always used."""
+    shared_source._search_cache.clear()
+    shared_source._files_cache.clear()
+    return shared_source
+
+
 class TestUSGSGAPSource:
     """Test cases for the USGS GAP source."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.source = USGSGAPSource()
-    
-    def test_initialization(self):
+    def test_initialization(self, source):
         """Test that the source initializes correctly."""
-        assert self.source.gap_item_id == "5951527de4b062508e3b1e79"
-        assert self.source.sciencebase_base_url == "https://www.sciencebase.gov"
+        assert source.gap_item_id == "5951527de4b062508e3b1e79"
+        assert source.sciencebase_base_url == "https://www.sciencebase.gov"
     
     @patch('rangepy.sources.ScienceBaseGAPSource._get_sciencebase_session')
-    def test_get_species_range_no_session(self, mock_get_session):
+    def test_get_species_range_no_session(self, mock_get_session, tmp_path, monkeypatch, source):
         """Test get_species_range when ScienceBase session cannot be created."""
         mock_get_session.return_value = None
+        monkeypatch.setattr(source, "cache_dir", tmp_path)
         # Should raise ValueError when no session can be created
         with pytest.raises(ValueError, match="No species data found in ScienceBase"):
-            self.source.get_species_range("Turdus migratorius")
+            source.get_species_range("Turdus migratorius")
     
     @patch('rangepy.sources.ScienceBaseGAPSource._get_sciencebase_session')
-    def test_search_species_no_session(self, mock_get_session):
+    def test_search_species_no_session(self, mock_get_session, source):
         """Test search_species when ScienceBase session cannot be created."""
         mock_get_session.return_value = None
-        result = self.source.search_species("robin")
-        assert result == []
\ No newline at end of file
+        result = source.search_species("robin")
+        assert result == []
+    
+    @patch('rangepy.sources.ScienceBaseGAPSource._get_sciencebase_session')
+    def test_search_species_cached(self, mock_get_session, source):
+        """Test that repeated searches for the same species reuse the ScienceBase response."""
+        session = MagicMock()
+        session.find_items.return_value = {
+            'items': [{'id': 'abc123', 'title': 'American Robin Range Map', 'summary': ''}]
+        }
+        mock_get_session.return_value = session
+        
+        first_result = source.search_species("Turdus migratorius")
+        second_result = source.search_species("Turdus migratorius")
+        
+        assert first_result == second_result == [{'title': 'American Robin Range Map', 'id': 'abc123', 'summary': ''}]
+        session.find_items.assert_called_once()
+    
+    @patch('rangepy.sources.ScienceBaseGAPSource._process_geospatial_file')
+    @patch('rangepy.sources.ScienceBaseGAPSource._get_sciencebase_session')
+    def test_download_stops_at_first_range(self, mock_get_session, mock_process, tmp_path, source):
+        """Test that files after the first usable one are not downloaded."""
+        session = MagicMock()
+        mock_get_session.return_value = session
+        mock_process.return_value = range_gdf = MagicMock()
+        files = [
+            {'name': 'range.zip', 'url': 'https://example.com/range.zip'},
+            {'name': 'habitat.zip', 'url': 'https://example.com/habitat.zip'},
+        ]
+        
+        result = source._download_and_process_range_files(files, str(tmp_path))
+        
+        assert result is range_gdf
+        session.download_file.assert_called_once_with('https://example.com/range.zip', 'range.zip', destination=str(tmp_path))
+    
+    def test_process_zip_file_reads_in_place(self, tmp_path, source):
+        """Test that ZIP archives are read without extracting them to disk."""
+        feature_collection = {
+            "type": "FeatureCollection",
+            "features": [{
+                "type": "Feature",
+                "properties": {},
+                "geometry": {"type": "Point", "coordinates": [-71.1, 42.4]}
+            }]
+        }
+        zip_path = tmp_path / "range.zip"
+        with zipfile.ZipFile(zip_path, "w") as zip_ref:
+            zip_ref.writestr("range/range.geojson", json.dumps(feature_collection))
+        
+        gdf = source._process_zip_file(zip_path, {'name': 'range.zip'})
+        
+        assert len(gdf) == 1
+        assert first(gdf['source_file']) == 'range.zip'
+        assert list(tmp_path.iterdir()) == [zip_path]
+    
+    @patch('rangepy.sources.ScienceBaseGAPSource._download_and_process_range_files')
+    @patch('rangepy.sources.ScienceBaseGAPSource._get_sciencebase_session')
+    def test_get_species_range_cached(self, mock_get_session, mock_download, tmp_path):
+        """Test that a cached range is returned without any ScienceBase request."""
+        import geopandas as gpd
+        from shapely.geometry import Point
+        
+        session = MagicMock()
+        session.find_items.return_value = {
+            'items': [{'id': 'abc123', 'title': 'American Robin Range Map'}]
+        }
+        session.get_item.return_value = {
+            'files': [{'name': 'range.zip', 'url': 'https://example.com/range.zip'}]
+        }
+        mock_get_session.return_value = session
+        mock_download.return_value = gpd.GeoDataFrame(geometry=[Point(-71.1, 42.4)], crs="EPSG:4326")
+        
+        source = USGSGAPSource()
+        source.cache_dir = tmp_path
+        first_result = source.get_species_range("Turdus migratorius")
+        
+        # A new source instance has no in-memory caches and must load the range from disk
+        session.reset_mock()
+        mock_download.reset_mock()
+        other_source = USGSGAPSource()
+        other_source.cache_dir = tmp_path
+        second_result = other_source.get_species_range("Turdus migratorius")
+        
+        session.find_items.assert_not_called()
+        session.get_item.assert_not_called()
+        mock_download.assert_not_called()
+        assert len(second_result) == len(first_result)
+        assert first(second_result['species_name']) == "Turdus migratorius"
+        assert first(second_result['item_id']) == "abc123"
+    
+    def test_cache_path(self, source):
+        """Test that cache files are keyed by GAP collection and normalized name."""
+        path = source._cache_path("  Turdus Migratorius ")
+        assert path.parent.name == source.gap_item_id
+        assert path.name == "turdus_migratorius.parquet"
+    
+    def test_write_cached_range_geoparquet(self, tmp_path, source):
+        """Test that cached ranges are written as GeoParquet and read back unchanged."""
+        import geopandas as gpd
+        import pyarrow.parquet as pq
+        from shapely.geometry import Point
+        
+        range_gdf = gpd.GeoDataFrame(
+            {'species_name': ["Turdus migratorius"]},
+            geometry=[Point(-71.1, 42.4)],
+            crs="EPSG:4326",
+        )
+        cache_path = tmp_path / "gap" / "turdus_migratorius.parquet"
+        
+        source._write_cached_range(range_gdf, cache_path)
+        
+        assert b"geo" in pq.read_metadata(cache_path).metadata
+        cached = source._read_cached_range(cache_path)
+        assert cached.crs == range_gdf.crs
+        assert cached.geom_equals(range_gdf).all()
+        assert list(tmp_path.joinpath("gap").iterdir()) == [cache_path]
+
+
+class TestUSGSGAPDuckDBSource:
+    """Test cases for the DuckDB-backed USGS GAP source."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        pytest.importorskip("duckdb")
+        self.source = USGSGAPDuckDBSource()
+    
+    @patch('rangepy.sources.ScienceBaseGAPSource.get_species_range')
+    def test_get_species_range_from_table(self, mock_get_range):
+        """Test that ranges stored in the gap table are returned without ScienceBase requests."""
+        import geopandas as gpd
+        from shapely.geometry import Point
+        
+        range_gdf = gpd.GeoDataFrame(
+            {
+                'species_name': ["Turdus migratorius"],
+                'source': ["sciencebase_gap"],
+                'item_id': ["abc123"],
+                'title': ["American Robin Range Map"],
+            },
+            geometry=[Point(-71.1, 42.4)],
+            crs="EPSG:4326",
+        )
+        self.source.add_range("Turdus migratorius", range_gdf)
+        
+        result = self.source.get_species_range("turdus  migratorius")
+        
+        mock_get_range.assert_not_called()
+        assert result.crs == range_gdf.crs
+        assert first(result['item_id']) == "abc123"
+        assert result.geom_equals(range_gdf).all()
+    
+    @patch('rangepy.sources.ScienceBaseGAPSource.get_species_range')
+    def test_get_species_range_fetches_missing(self, mock_get_range):
+        """Test that missing ranges are fetched once and then served from the table."""
+        import geopandas as gpd
+        from shapely.geometry import Point
+        
+        mock_get_range.return_value = gpd.GeoDataFrame(
+            {'species_name': ["Turdus migratorius"], 'file_size': [1024]},
+            geometry=[Point(-71.1, 42.4)],
+            crs="EPSG:4326",
+        )
+        
+        fetched = self.source.get_species_range("Turdus migratorius")
+        result = self.source.get_species_range("Turdus migratorius")
+        
+        mock_get_range.assert_called_once_with("Turdus migratorius")
+        assert len(result) == 1
+        assert list(fetched.columns) == list(result.columns)
+    
+    @patch('rangepy.sources.ScienceBaseGAPSource.get_species_range')
+    def test_get_species_range_null_geometry(self, mock_get_range):
+        """Test that null geometries are stored and returned as missing values."""
+        import geopandas as gpd
+        from shapely.geometry import Point
+        
+        range_gdf = gpd.GeoDataFrame(
+            {'species_name': ["Turdus migratorius"] * 2},
+            geometry=[Point(-71.1, 42.4), None],
+            crs="EPSG:4326",
+        )
+        self.source.add_range("Turdus migratorius", range_gdf)
+        
+        result = self.source.get_species_range("Turdus migratorius")
+        
+        mock_get_range.assert_not_called()
+        assert len(result) == 2
+        assert result.geometry.isna().sum() == 1
+        assert result.geometry.dropna().geom_equals(range_gdf.geometry.dropna()).all()
+    
+    @patch('rangepy.sources.ScienceBaseGAPSource._search_gap_species')
+    def test_get_species_range_fills_from_file_cache(self, mock_search, tmp_path):
+        """Test that ranges missing from the table are loaded from the GeoParquet cache."""
+        import geopandas as gpd
+        from shapely.geometry import Point
+        
+        self.source.cache_dir = tmp_path
+        range_gdf = gpd.GeoDataFrame(
+            {'species_name': ["Turdus migratorius"], 'item_id': ["abc123"]},
+            geometry=[Point(-71.1, 42.4)],
+            crs="EPSG:4326",
+        )
+        self.source._write_cached_range(range_gdf, self.source._cache_path("Turdus migratorius"))
+        
+        result = self.source.get_species_range("Turdus migratorius")
+        
+        mock_search.assert_not_called()
+        assert first(result['item_id']) == "abc123"
+        assert result.geom_equals(range_gdf).all()
+    
+    def test_close(self):
+        """Test that the source closes its connection when used as a context manager."""
+        import duckdb
+        
+        with USGSGAPDuckDBSource() as source:
+            assert source.con.execute("SELECT 1").fetchone() == (1,)
+        
+        with pytest.raises(duckdb.Error):
+            source.con.execute("SELECT 1")
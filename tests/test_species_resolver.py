@@ -1,112 +1,258 @@
+import copy
+import json
+import pickle
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 import requests
-from rangepy.species_resolver import SpeciesNameResolver
+from rangepy.species_resolver import SpeciesMatch, SpeciesNameResolver
+
+
+RESOLVE_CASES = [
+    ({
+        "matchType": "EXACT",
+        "canonicalName": "Turdus migratorius",
+        "vernacularName": "American Robin",
+        "kingdom": "Animalia",
+        "phylum": "Chordata",
+        "class": "Aves",
+        "order": "Passeriformes",
+        "family": "Turdidae",
+        "genus": "Turdus",
+        "species": "migratorius",
+        "confidence": 100
+    }, "Turdus migratorius"),
+    ({
+        "matchType": "FUZZY",
+        "canonicalName": "Turdus migratorius",
+        "vernacularName": "American Robin"
+    }, "Turdus migratorius"),
+    ({"matchType": "NONE"}, None),
+    ({"matchType": "HIGHERRANK", "canonicalName": "Turdus"}, None),
+]
+
+
+@pytest.fixture(scope="module")
+def shared_resolver():
+    """Resolver instance shared by all tests in this module, always querying the (mocked) API."""
+    return SpeciesNameResolver(use_checklist=False)
+
+
+@pytest.fixture
+def resolver(shared_resolver):
+    """Shared resolver with an empty cache, so mocked responses are always used."""
+    shared_resolver.invalidate()
+    return shared_resolver
 
 
 class TestSpeciesNameResolver:
     """Test cases for the species name resolver."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.resolver = SpeciesNameResolver()
-    
-    @patch('rangepy.species_resolver.requests.get')
-    def test_resolve_name_success(self, mock_get):
-        """Test successful species name resolution."""
-        # Mock successful API response
-        mock_response = MagicMock()
-        mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = {
-            "matchType": "EXACT",
-            "canonicalName": "Turdus migratorius",
-            "vernacularName": "American Robin",
-            "kingdom": "Animalia",
-            "phylum": "Chordata",
-            "class": "Aves",
-            "order": "Passeriformes",
-            "family": "Turdidae",
-            "genus": "Turdus",
-            "species": "migratorius",
-            "confidence": 100
-        }
-        mock_get.return_value = mock_response
+    @pytest.mark.parametrize("payload,expected", RESOLVE_CASES)
+    @patch('rangepy.species_resolver.requests.Session.get')
+    def test_resolve_name(self, mock_get, payload, expected, resolver, fake_response):
+        """Test species name resolution for different GBIF match results."""
+        mock_get.return_value = fake_response(payload)
         
         # Test the function
-        result = self.resolver.resolve_name("American Robin")
+        result = resolver.resolve_name("American Robin")
         
         # Verify the result
-        assert result is not None
-        assert result["scientific_name"] == "Turdus migratorius"
-        assert result["common_name"] == "American Robin"
-        assert result["kingdom"] == "Animalia"
-        assert result["confidence"] == 100
+        if expected is None:
+            assert result is None
+        else:
+            assert result.scientific_name == expected
+            assert result.common_name == payload.get("vernacularName", "")
+            assert result.kingdom == payload.get("kingdom", "")
+            assert result.class_ == payload.get("class", "")
+            assert result.confidence == payload.get("confidence", 0)
         
         # Verify API was called correctly
         mock_get.assert_called_once()
-        call_args = mock_get.call_args
-        assert "name" in call_args[1]["params"]
-        assert call_args[1]["params"]["name"] == "American Robin"
+        assert mock_get.call_args[1]["params"]["name"] == "American Robin"
     
-    @patch('rangepy.species_resolver.requests.get')
-    def test_resolve_name_no_match(self, mock_get):
-        """Test species name resolution with no match."""
-        # Mock API response with no match
-        mock_response = MagicMock()
-        mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = {
-            "matchType": "NONE"
-        }
-        mock_get.return_value = mock_response
+    @pytest.mark.parametrize("payload,expected", RESOLVE_CASES)
+    @patch('rangepy.species_resolver.requests.Session.get')
+    def test_get_scientific_name(self, mock_get, payload, expected, resolver, fake_response):
+        """Test getting scientific name directly."""
+        mock_get.return_value = fake_response(payload)
         
         # Test the function
-        result = self.resolver.resolve_name("Invalid Species")
+        result = resolver.get_scientific_name("American Robin")
         
         # Verify the result
-        assert result is None
+        assert result == expected
     
-    @patch('rangepy.species_resolver.requests.get')
-    def test_resolve_name_api_error(self, mock_get):
+    @patch('rangepy.species_resolver.requests.Session.get')
+    def test_resolve_name_api_error(self, mock_get, resolver):
         """Test species name resolution with API error."""
         # Mock API error
         mock_get.side_effect = requests.RequestException("API Error")
         
         # Test the function
-        result = self.resolver.resolve_name("American Robin")
+        result = resolver.resolve_name("American Robin")
         
         # Verify the result
         assert result is None
     
-    @patch('rangepy.species_resolver.requests.get')
-    def test_get_scientific_name(self, mock_get):
-        """Test getting scientific name directly."""
+    @patch('rangepy.species_resolver.requests.Session.get')
+    def test_resolve_name_cached(self, mock_get, resolver, fake_response):
+        """Test that repeated lookups of the same name are served from the cache."""
         # Mock successful API response
-        mock_response = MagicMock()
-        mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = {
+        mock_get.return_value = fake_response({
             "matchType": "EXACT",
             "canonicalName": "Turdus migratorius",
             "vernacularName": "American Robin"
-        }
-        mock_get.return_value = mock_response
+        })
         
-        # Test the function
-        result = self.resolver.get_scientific_name("American Robin")
+        # Test the function with differently formatted queries
+        first = resolver.resolve_name("American Robin")
+        second = resolver.resolve_name("  american   robin ")
+        
+        # Verify the API was only called once
+        assert first == second
+        mock_get.assert_called_once()
+        
+        # Invalidating the cache should trigger a new lookup
+        resolver.invalidate()
+        resolver.resolve_name("American Robin")
+        assert mock_get.call_count == 2
+    
+    @patch('rangepy.species_resolver.requests.Session.get')
+    def test_resolve_name_persistent_cache(self, mock_get, tmp_path, fake_response):
+        """Test that resolved names are persisted to and loaded from the cache file."""
+        # Mock successful API response
+        mock_get.return_value = fake_response({
+            "matchType": "EXACT",
+            "canonicalName": "Turdus migratorius",
+            "vernacularName": "American Robin"
+        })
+        cache_file = tmp_path / "gbif_match.json"
+        
+        # Resolve with one resolver and write its cache
+        resolver = SpeciesNameResolver(cache_file=str(cache_file), use_checklist=False)
+        resolver.resolve_name("American Robin")
+        resolver._save_cache()
+        assert cache_file.exists()
+        
+        # A new resolver should answer from the cache file without calling the API
+        mock_get.reset_mock()
+        result = SpeciesNameResolver(cache_file=str(cache_file), use_checklist=False).resolve_name("American Robin")
+        assert result.scientific_name == "Turdus migratorius"
+        mock_get.assert_not_called()
+    
+    @pytest.mark.parametrize("content", [
+        "{not json",
+        "[1, 2, 3]",
+        '{"american robin": {"common_name": "American Robin"}}',
+        '{"american robin": "Turdus migratorius"}',
+    ])
+    def test_malformed_persistent_cache(self, content, tmp_path):
+        """Test that a malformed cache file is dropped instead of failing."""
+        cache_file = tmp_path / "gbif_match.json"
+        cache_file.write_text(content, encoding="utf-8")
+        
+        # Loading must not raise, and the bad file is replaced on the next save
+        resolver = SpeciesNameResolver(cache_file=str(cache_file), use_checklist=False)
+        assert resolver._matches == {}
+        resolver._save_cache()
+        assert json.loads(cache_file.read_text(encoding="utf-8")) == {}
+        assert list(tmp_path.iterdir()) == [cache_file]
+    
+    @patch('rangepy.species_resolver.requests.Session.get')
+    def test_resolve_names(self, mock_get, resolver, fake_response):
+        """Test resolving several names at once."""
+        # Mock API responses depending on the queried name
+        def respond(url, params, timeout):
+            if params["name"] == "American Robin":
+                return fake_response({
+                    "matchType": "EXACT",
+                    "canonicalName": "Turdus migratorius",
+                    "vernacularName": "American Robin"
+                })
+            return fake_response({"matchType": "NONE"})
+        mock_get.side_effect = respond
+        
+        # Test the function with a duplicated name
+        result = resolver.resolve_names(["American Robin", "Invalid Species", "American Robin"])
+        
+        # Verify results are in input order and each distinct name was looked up once
+        assert len(result) == 3
+        assert result[0].scientific_name == "Turdus migratorius"
+        assert result[1] is None
+        assert result[2].scientific_name == "Turdus migratorius"
+        assert mock_get.call_count == 2
+    
+    @patch('rangepy.species_resolver.requests.Session.get')
+    def test_resolve_local_hit_no_network(self, mock_get):
+        """Test that names in the bundled checklist are resolved without calling the API."""
+        resolver = SpeciesNameResolver()
+        
+        # Test the function with a common and a scientific name
+        by_common_name = resolver.resolve_name("American Robin")
+        by_scientific_name = resolver.resolve_name("turdus  migratorius")
         
         # Verify the result
-        assert result == "Turdus migratorius"
+        assert by_common_name.scientific_name == "Turdus migratorius"
+        assert by_common_name.class_ == "Aves"
+        assert by_scientific_name == by_common_name
+        mock_get.assert_not_called()
     
-    @patch('rangepy.species_resolver.requests.get')
-    def test_get_scientific_name_not_found(self, mock_get):
-        """Test getting scientific name for non-existent species."""
-        # Mock API response with no match
-        mock_response = MagicMock()
-        mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = {"matchType": "NONE"}
-        mock_get.return_value = mock_response
+    @patch('rangepy.species_resolver.requests.Session')
+    def test_resolve_names_single_session(self, mock_session_cls, fake_response):
+        """Test that a batch of names is resolved over a single HTTP session."""
+        # Mock API response without a match
+        mock_session_cls.return_value.get.return_value = fake_response({"matchType": "NONE"})
         
         # Test the function
-        result = self.resolver.get_scientific_name("Invalid Species")
+        resolver = SpeciesNameResolver()
+        result = resolver.resolve_names([f"Species {i}" for i in range(10)])
         
-        # Verify the result
-        assert result is None
\ No newline at end of file
+        # Verify one session served all lookups
+        assert result == [None] * 10
+        mock_session_cls.assert_called_once()
+        assert mock_session_cls.return_value.get.call_count == 10
+
+
+class TestSpeciesMatch:
+    """Test cases for the resolved species record."""
+    
+    def test_dict_compatibility(self):
+        """Test conversion from and to dicts and dict-style access."""
+        data = {
+            "scientific_name": "Turdus migratorius",
+            "common_name": "American Robin",
+            "kingdom": "Animalia",
+            "phylum": "Chordata",
+            "class": "Aves",
+            "order": "Passeriformes",
+            "family": "Turdidae",
+            "genus": "Turdus",
+            "species": "Turdus migratorius",
+            "confidence": 98
+        }
+        match = SpeciesMatch.from_dict(data)
+        
+        assert match.as_dict() == data
+        assert match["scientific_name"] == "Turdus migratorius"
+        assert match["class"] == "Aves"
+        with pytest.raises(KeyError):
+            match["unknown"]
+        assert "kingdom" in match
+        assert "unknown" not in match
+        assert list(match) == list(data)
+        assert dict(match) == data
+        assert match.get("common_name", "") == "American Robin"
+        assert match.get("unknown", "") == ""
+    
+    def test_copy_and_pickle(self):
+        """Test that matches survive copying and pickling despite being frozen."""
+        match = SpeciesMatch.from_dict({
+            "scientific_name": "Turdus migratorius",
+            "common_name": "American Robin",
+            "class": "Aves",
+            "confidence": 98
+        })
+        
+        assert copy.copy(match) == match
+        assert copy.deepcopy(match) == match
+        assert pickle.loads(pickle.dumps(match)) == match